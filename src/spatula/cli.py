@@ -5,21 +5,68 @@ import importlib
 import inspect
 import json
 import logging
+import os
+import queue
+import socket
 import sys
+import threading
+import time
 import typing
 import uuid
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from types import ModuleType
 import lxml.html  # type: ignore
 import click
+from requests.adapters import HTTPAdapter
 from scrapelib import Scraper, SQLiteCache
+from . import config
 from .utils import _display, _obj_to_dict, attr_has, attr_fields
 from .sources import URL, Source
-from .pages import Page, ListPage
+from .pages import Page, ListPage, _parse_streamed
 
 
 VERSION = "0.9.0"
+SHELL_CHUNK_SIZE = 32768
+TEST_OUTPUT_BATCH_SIZE = 100
+JSONL_BUFFER_SIZE = 65536
+
+_getaddrinfo = socket.getaddrinfo
+_dns_cache: typing.Dict[tuple, typing.Tuple[float, typing.Any]] = {}
+
+
+def _cached_getaddrinfo(
+    host: typing.Any,
+    port: typing.Any,
+    family: int = 0,
+    type: int = 0,
+    proto: int = 0,
+    flags: int = 0,
+) -> typing.Any:
+    key = (host, port, family, type, proto, flags)
+    now = time.monotonic()
+    cached = _dns_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+    try:
+        result = _getaddrinfo(host, port, family, type, proto, flags)
+    except socket.gaierror:
+        _dns_cache.pop(key, None)
+        raise
+    _dns_cache[key] = (now + config.DNS_CACHE_TTL, result)
+    return result
+
+
+def configure_dns_cache() -> None:
+    """
+    cache DNS lookups for the rest of the process, since scrapes tend to make
+    many requests to the same handful of hosts
+    """
+    if config.DNS_CACHE_TTL > 0:
+        socket.getaddrinfo = _cached_getaddrinfo
+    else:
+        socket.getaddrinfo = _getaddrinfo
 
 
 def scraper_params(func: typing.Callable) -> typing.Callable:
@@ -76,21 +123,31 @@ def scraper_params(func: typing.Callable) -> typing.Callable:
         fastmode: bool,
         **kwargs: str,
     ) -> None:
-        scraper = Scraper(
-            requests_per_minute=rpm,
-            retry_attempts=retries,
-            retry_wait_seconds=retry_wait,
-            verify=verify,
-        )
-        scraper.timeout = timeout
-        scraper.user_agent = user_agent
-        # only update headers, don't overwrite defaults
-        scraper.headers.update(
-            {k.strip(): v.strip() for k, v in [h.split(":") for h in header]}
-        )
-        if fastmode:
-            scraper.cache_storage = SQLiteCache("spatula-cache.db")
-            scraper.cache_write_only = False
+        def make_scraper() -> Scraper:
+            scraper = Scraper(
+                requests_per_minute=rpm,
+                retry_attempts=retries,
+                retry_wait_seconds=retry_wait,
+                verify=verify,
+            )
+            # size the connection pool from spatula.config instead of requests'
+            # defaults, retries are left to scrapelib so they aren't done twice
+            adapter = HTTPAdapter(
+                pool_connections=config.HTTP_POOL_CONNECTIONS,
+                pool_maxsize=config.HTTP_POOL_MAXSIZE,
+            )
+            scraper.mount("http://", adapter)
+            scraper.mount("https://", adapter)
+            scraper.timeout = timeout
+            scraper.user_agent = user_agent
+            # only update headers, don't overwrite defaults
+            scraper.headers.update(
+                {k.strip(): v.strip() for k, v in [h.split(":") for h in header]}
+            )
+            if fastmode:
+                scraper.cache_storage = SQLiteCache("spatula-cache.db")
+                scraper.cache_write_only = False
+            return scraper
 
         if verbosity == -1:
             level = logging.INFO if func.__name__ != "test" else logging.DEBUG
@@ -106,8 +163,13 @@ def scraper_params(func: typing.Callable) -> typing.Callable:
             logging.getLogger("scrapelib").setLevel(logging.ERROR)
             logging.getLogger("urllib3").setLevel(logging.WARNING)
         logging.basicConfig(level=level)
+        configure_dns_cache()
 
-        return func(**kwargs, scraper=scraper)
+        # commands that use worker threads need a scraper per thread, since
+        # neither the sqlite cache nor scrapelib's throttling can be shared
+        if "scraper_factory" in inspect.signature(func).parameters:
+            kwargs["scraper_factory"] = make_scraper  # type: ignore
+        return func(**kwargs, scraper=make_scraper())
 
     return newfunc
 
@@ -124,6 +186,7 @@ def import_mod(name: str) -> typing.Union[ModuleType, type]:
         return importlib.import_module(name)
 
 
+@functools.lru_cache(maxsize=None)
 def get_page_class(dotted_name: str) -> type:
     mod_name, cls_name = dotted_name.rsplit(".", 1)
     mod = import_mod(mod_name)
@@ -131,6 +194,7 @@ def get_page_class(dotted_name: str) -> type:
     return Cls
 
 
+@functools.lru_cache(maxsize=None)
 def get_dump_function(
     dotted_name: str,
 ) -> typing.Callable[[typing.Optional[dict], typing.IO], None]:
@@ -176,6 +240,39 @@ def get_pages(dotted_name: str, source: typing.Optional[str]) -> typing.List[Pag
             return [Cls(source=source)]
 
 
+class _BatchedEcho:
+    """
+    collect output lines and echo them in batches, rather than one write per line
+    """
+
+    def __init__(self, batch_size: int = TEST_OUTPUT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.lines: typing.List[str] = []
+
+    def echo(self, line: str) -> None:
+        self.lines.append(line)
+        if len(self.lines) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.lines:
+            click.echo("\n".join(self.lines))
+            self.lines = []
+
+    def __enter__(self) -> "_BatchedEcho":
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        self.flush()
+
+
+def _close_scraper(scraper: Scraper) -> None:
+    scraper.close()
+    # SQLiteCache has no close(), and its connection must be closed by its own thread
+    if isinstance(scraper.cache_storage, SQLiteCache):
+        scraper.cache_storage._conn.close()
+
+
 def get_new_filename(obj: typing.Any) -> str:
     if hasattr(obj, "get_filename"):
         return obj.get_filename()
@@ -183,6 +280,11 @@ def get_new_filename(obj: typing.Any) -> str:
         return str(uuid.uuid4())
 
 
+def _to_json_line(data: typing.Optional[dict]) -> bytes:
+    # always the stdlib serializer, so lines match json.dump's per-item output
+    return (json.dumps(data) + "\n").encode()
+
+
 @click.group()
 @click.version_option(version=VERSION)
 def cli() -> None:
@@ -192,10 +294,18 @@ def cli() -> None:
 @cli.command()
 @click.argument("url")
 @click.option("-X", "--verb", default="GET", help="set HTTP verb such as POST")
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Parse the page as it downloads, root is always the full <html> document.",
+)
 @scraper_params
-def shell(url: str, verb: str, scraper: Scraper) -> None:
+def shell(url: str, verb: str, stream: bool, scraper: Scraper) -> None:
     """
     Start a session to interact with a particular page.
+
+    When repeatedly inspecting the same page, use `--fastmode` to reuse the cached
+    response instead of fetching it again.
     """
     try:
         from IPython import embed  # type: ignore
@@ -206,8 +316,12 @@ def shell(url: str, verb: str, scraper: Scraper) -> None:
     # import selectors so they can be used without import
     from .selectors import SelectorError, XPath, SimilarLink, CSS  # noqa
 
-    resp = scraper.request(verb, url)
-    root = lxml.html.fromstring(resp.content)  # noqa
+    resp = scraper.request(verb, url, stream=stream)
+    if stream:
+        # a feed parser wraps fragments in <html>, unlike fromstring
+        root = _parse_streamed(lxml.html.HTMLParser(), resp, SHELL_CHUNK_SIZE)
+    else:
+        root = lxml.html.fromstring(resp.content)
     click.secho(f"spatula {VERSION} shell", fg="blue")
     click.secho("available selectors: CSS, SimilarLink, XPath", fg="blue")
     click.secho("local variables", fg="green")
@@ -218,6 +332,17 @@ def shell(url: str, verb: str, scraper: Scraper) -> None:
     embed()
 
 
+@functools.lru_cache(maxsize=None)
+def _get_fields(input_type: type) -> typing.Sequence[typing.Any]:
+    if dataclasses.is_dataclass(input_type):
+        return dataclasses.fields(input_type)
+    elif attr_has(input_type):  # pragma: no cover
+        # ignore type rules here since dataclasses/attr do not share a base
+        # but fields will have a name no matter what
+        return attr_fields(input_type)  # type: ignore
+    return ()
+
+
 def _get_fake_input(Cls: type, data: typing.List[str], interactive: bool) -> typing.Any:
     # build fake input from command line data if present
     fake_input = {}
@@ -236,22 +361,22 @@ def _get_fake_input(Cls: type, data: typing.List[str], interactive: bool) -> typ
 
     input_type = getattr(Cls, "input_type", None)
     if input_type:
-        click.secho(f"{Cls.__name__} expects input ({input_type.__name__}): ")
-        if dataclasses.is_dataclass(input_type):
-            fields = dataclasses.fields(input_type)
-        elif attr_has(input_type):  # pragma: no cover
-            # ignore type rules here since dataclasses/attr do not share a base
-            # but fields will have a name no matter what
-            fields = attr_fields(input_type)  # type: ignore
-        for field in fields:
+        # buffer output so it is written once, except when prompting
+        lines = [f"{Cls.__name__} expects input ({input_type.__name__}): "]
+        for field in _get_fields(input_type):
             if field.name in fake_input:
-                click.secho(f"  {field.name}: {fake_input[field.name]}")
+                lines.append(f"  {field.name}: {fake_input[field.name]}")
             elif interactive:
+                if lines:
+                    click.echo("\n".join(lines))
+                    lines = []
                 fake_input[field.name] = click.prompt("  " + field.name)
             else:
                 dummy_val = f"~{field.name}"
                 fake_input[field.name] = dummy_val
-                click.secho(f"  {field.name}: {dummy_val}")
+                lines.append(f"  {field.name}: {dummy_val}")
+        if lines:
+            click.echo("\n".join(lines))
         return input_type(**fake_input)
     else:
         return fake_input
@@ -319,15 +444,23 @@ def test(
     if not source_obj and hasattr(Cls, "example_source"):
         source_obj = Cls.example_source  # type: ignore
 
+    # style the numbered prefixes once, rather than once per item
+    item_fmt = click.style("%d: ", fg="green") + "%s"
+    subpage_fmt = click.style("%d: would continue with ", fg="blue") + "%s"
+
     if subpages:
         initial_page = Cls(fake_input, source=source_obj)
-        for n, item in enumerate(initial_page._to_items(scraper)):
-            click.echo(click.style(f"{n+1}: ", fg="green") + _display(item))
+        # each item may need a subpage fetched, so show them as they arrive
+        for n, item in enumerate(initial_page._to_items(scraper), 1):
+            click.echo(item_fmt % (n, _display(item)))
     else:
         # a custom loop instead of _to_items so we can avoid subpages
         # we need to do the request-response-next-page loop at least once
         once = True
         num_items = 0
+        # process_page is the same for every page, check how it returns results once
+        # (a plain function may still return a generator, so that is checked below)
+        is_gen = inspect.isgeneratorfunction(Cls.process_page)  # type: ignore
         while source_obj or once:
             once = False
             page = Cls(fake_input, source=source_obj)
@@ -337,19 +470,15 @@ def test(
 
             result = page.process_page()
 
-            if isinstance(result, typing.Generator):
-                for item in result:
-                    # use this count instead of enumerate to handle pagination
-                    num_items += 1
-                    if isinstance(item, Page):
-                        click.echo(
-                            click.style(f"{num_items}: would continue with ", fg="blue")
-                            + _display(item)
-                        )
-                    else:
-                        click.echo(
-                            click.style(f"{num_items}: ", fg="green") + _display(item)
-                        )
+            if is_gen or isinstance(result, typing.Generator):
+                with _BatchedEcho() as out:
+                    for item in result:
+                        # use this count instead of enumerate to handle pagination
+                        num_items += 1
+                        if isinstance(item, Page):
+                            out.echo(subpage_fmt % (num_items, _display(item)))
+                        else:
+                            out.echo(item_fmt % (num_items, _display(item)))
             else:
                 click.secho(_display(result))
 
@@ -380,6 +509,20 @@ def test(
 )
 @click.option("-s", "--source", help="Provide (or override) source URL")
 @click.option("--dump", help="Specify dump function", default="json.dump")
+@click.option(
+    "--concurrency",
+    default=1,
+    help="number of initial pages to scrape concurrently, each worker has its own "
+    "--rpm limit and cache connection (default: 1)",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["per-item", "jsonl"]),
+    default="per-item",
+    help="write one file per item (using --dump) or all items to a single "
+    "items.jsonl file (default: per-item)",
+)
 @scraper_params
 def scrape(
     initial_page_name: str,
@@ -388,14 +531,22 @@ def scrape(
     source: typing.Optional[str],
     scraper: Scraper,
     dump: str,
+    concurrency: int,
+    output_format: str,
+    scraper_factory: typing.Callable[[], Scraper],
 ) -> None:
     """
     Run full scrape, and output data to disk.
     """
     # ensure output directory is ready
     if not output_dir:
-        dirn = 1
         today = datetime.date.today().strftime("%Y-%m-%d")
+        # start after the highest existing directory, only probing if that is taken
+        try:
+            existing = [int(p.name) for p in Path(f"_scrapes/{today}").iterdir()]
+            dirn = max(existing, default=0) + 1
+        except (FileNotFoundError, ValueError):
+            dirn = 1
         while True:
             try:
                 output_path = Path(f"_scrapes/{today}/{dirn:03d}")
@@ -418,16 +569,71 @@ def scrape(
                     sys.exit(1)
 
     dump_func = get_dump_function(dump)
-    # actually do the scrape
-    count = 0
-    pages = get_pages(initial_page_name, source)
-    for initial_page in pages:
-        for item in initial_page._to_items(scraper):
+    jsonl_file: typing.Optional[typing.BinaryIO] = None
+    if output_format == "jsonl":
+        jsonl_file = open(
+            output_path / "items.jsonl", "wb", buffering=JSONL_BUFFER_SIZE
+        )
+    # initial pages may be scraped concurrently, but share the same jsonl file
+    jsonl_lock = threading.Lock()
+
+    def write_item(item: typing.Any) -> None:
+        data = _obj_to_dict(item)
+        if jsonl_file:
+            line = _to_json_line(data)
+            with jsonl_lock:
+                jsonl_file.write(line)
+        else:
             filename = output_path / (get_new_filename(item) + ".json")
-            data = _obj_to_dict(item)
             with open(filename, "w") as f:
                 dump_func(data, f)
+
+    def scrape_page(initial_page: Page, scraper: Scraper = scraper) -> int:
+        count = 0
+        for item in initial_page._to_items(scraper):
+            write_item(item)
             count += 1
+        return count
+
+    def scrape_worker(page_queue: "queue.Queue[Page]") -> int:
+        # each worker thread creates & reuses one scraper for all of the pages it
+        # takes, since neither the sqlite cache nor the throttle can be shared
+        worker_scraper = scraper_factory()
+        count = 0
+        try:
+            while True:
+                try:
+                    initial_page = page_queue.get_nowait()
+                except queue.Empty:
+                    return count
+                count += scrape_page(initial_page, worker_scraper)
+        finally:
+            _close_scraper(worker_scraper)
+
+    # actually do the scrape, each initial page (and its pagination) is independent
+    # of the others so they can be run concurrently
+    pages = get_pages(initial_page_name, source)
+    try:
+        if concurrency > 1 and len(pages) > 1:
+            # requests release the GIL while waiting on the network, so threads
+            # are enough to overlap the independent scrapes
+            page_queue: "queue.Queue[Page]" = queue.Queue()
+            for initial_page in pages:
+                page_queue.put(initial_page)
+            num_workers = min(concurrency, len(pages))
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                futures = [
+                    executor.submit(scrape_worker, page_queue)
+                    for _ in range(num_workers)
+                ]
+                count = sum(future.result() for future in as_completed(futures))
+        else:
+            count = sum(scrape_page(initial_page) for initial_page in pages)
+    finally:
+        if jsonl_file:
+            jsonl_file.flush()
+            os.fsync(jsonl_file.fileno())
+            jsonl_file.close()
     click.secho(f"success: wrote {count} objects to {output_path}", fg="green")
 
 
@@ -2,3 +2,6 @@ import os
 
 REJECTED_RESPONSE_RETRIES = int(os.environ.get("SPATULA_REJECTED_RESPONSE_RETRIES", 1))
 RETRY_WAIT_SECONDS = float(os.environ.get("SPATULA_RETRY_WAIT_SECONDS", 5))
+HTTP_POOL_CONNECTIONS = int(os.environ.get("SPATULA_HTTP_POOL_CONNECTIONS", 16))
+HTTP_POOL_MAXSIZE = int(os.environ.get("SPATULA_HTTP_POOL_MAXSIZE", 64))
+DNS_CACHE_TTL = float(os.environ.get("SPATULA_DNS_CACHE_TTL", 300))
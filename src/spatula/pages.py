@@ -11,8 +11,34 @@ import scrapelib
 import lxml.html  # type: ignore
 from openpyxl import load_workbook  # type: ignore
 from . import config
+from .selectors import CSS
 from .sources import Source, URL
-from .utils import _obj_to_dict
+from .utils import _obj_to_dict, orjson
+
+
+def _parse_streamed(
+    parser: typing.Any, response: requests.Response, chunk_size: int = 65536
+) -> typing.Any:
+    """
+    feed the response body to an lxml feed parser as it is downloaded
+
+    the body is kept so that response.content remains usable afterwards
+    """
+    if response.raw is None:
+        # responses from a cache are already loaded and have no stream
+        parser.feed(response.content)
+    else:
+        chunks = []
+        for chunk in response.iter_content(chunk_size):
+            parser.feed(chunk)
+            chunks.append(chunk)
+        # requests has no public way to keep a streamed body once it is consumed
+        response._content = b"".join(chunks)
+    root = parser.close()
+    if root is None:
+        # matches lxml.html.fromstring, feed parsers return None for blank input
+        raise lxml.etree.ParserError("Document is empty")
+    return root
 
 
 def _to_scout_result(result: typing.Any) -> typing.Dict[str, typing.Any]:
@@ -108,6 +134,11 @@ class Page:
     `example_source`
     :   Source to fetch when invoking `spatula test`.
 
+    `stream_response`
+    :   set to `True` to request the response as a stream, allowing pages such as
+        `HtmlPage` and `XmlPage` to parse it while it is being downloaded.
+        (`False` by default)
+
     `dependencies`
     :   Dictionary mapping of names to `Page` objects that will be available before `process_page`.
 
@@ -128,6 +159,7 @@ class Page:
     """
 
     source: typing.Union[None, str, Source] = None
+    stream_response = False
     dependencies: typing.Dict[str, "Page"] = {}
     _cached_dependencies: typing.Dict[str, typing.Any] = {}
 
@@ -168,29 +200,42 @@ class Page:
         while attempts_remaining:
             attempts_remaining -= 1
             try:
-                response = self.source.get_response(scraper)  # type: ignore
+                if self.stream_response:
+                    response = self.source.get_response(scraper, stream=True)  # type: ignore
+                else:
+                    response = self.source.get_response(scraper)  # type: ignore
                 if getattr(response, "fromcache", None):
                     self.logger.debug(f"retrieved {self.source} from cache")
                 if self.accept_response(response):
                     self.response = response
                 elif attempts_remaining:
+                    self._close_streamed(response)
                     self.logger.debug(
                         f"response rejected, {attempts_remaining}/{total_attempts} attempts remaining, sleeping {config.RETRY_WAIT_SECONDS}s..."
                     )
                     time.sleep(config.RETRY_WAIT_SECONDS)
                     continue
                 else:
+                    self._close_streamed(response)
                     self.logger.debug(
                         f"response rejected, 0/{total_attempts} attempts remaining"
                     )
                     raise RejectedResponse(total_attempts, response)
             except scrapelib.HTTPError as e:
-                self.process_error_response(e)
+                try:
+                    self.process_error_response(e)
+                finally:
+                    self._close_streamed(e.response)
                 raise HandledError(e)
             else:
                 self.postprocess_response()
                 break
 
+    def _close_streamed(self, response: typing.Optional[requests.Response]) -> None:
+        # an unread streamed response holds on to its pooled connection until closed
+        if self.stream_response and response is not None:
+            response.close()
+
     def _paginate(
         self, scraper: scrapelib.Scraper, scout: bool
     ) -> typing.Iterable[typing.Any]:
@@ -255,13 +300,9 @@ class Page:
         )
 
     def __str__(self) -> str:
-        s = f"{self.__class__.__name__}("
-        if self.input:
-            s += f"input={self.input} "
-        if self.source:
-            s += f"source={self.source}"
-        s += ")"
-        return s
+        input_str = f"input={self.input} " if self.input else ""
+        source_str = f"source={self.source}" if self.source else ""
+        return f"{self.__class__.__name__}({input_str}{source_str})"
 
     def do_scrape(
         self, scraper: typing.Optional[scrapelib.Scraper] = None
@@ -332,12 +373,49 @@ class HtmlPage(Page):
 
         Can use the normal lxml methods (such as `cssselect` and `getchildren`), or
         use this element as the target of a `Selector` subclass.
+
+    `lxml_parser`
+    :   `lxml.html.HTMLParser` used to parse the page, created once per class.
+        Can be replaced on derived class to change parser options, such as
+        `huge_tree=True` for unusually large documents, or `collect_ids=False`
+        to skip building the id table if XPath's `id()` is not used.
+
+    `parser_backend`
+    :   set to `"selectolax"` on derived class to parse the page with
+        [selectolax](https://github.com/rushter/selectolax)'s faster lexbor backend.
+        `root` will then be a `LexborNode` that only supports `CSS` selectors,
+        and links will not be made absolute.
+        (`"lxml"` by default)
     """
 
+    lxml_parser = lxml.html.HTMLParser()
+    parser_backend = "lxml"
+
     def postprocess_response(self) -> None:
-        self.root = lxml.html.fromstring(self.response.content)
-        if hasattr(self.source, "url"):
-            self.root.make_links_absolute(self.source.url)  # type: ignore
+        if self.parser_backend == "selectolax":
+            from selectolax.lexbor import LexborHTMLParser  # type: ignore
+
+            # only CSS selectors can match selectolax nodes (lxml raises TypeError
+            # for others), check a list page's selector once rather than per match
+            selector = getattr(self, "selector", None)
+            if selector is not None and not isinstance(selector, CSS):
+                raise TypeError(
+                    f"{self.__class__.__name__} uses parser_backend='selectolax', "
+                    f"which only supports CSS selectors, not {selector}"
+                )
+            self.root = LexborHTMLParser(self.response.content).root
+        elif self.parser_backend == "lxml":
+            if self.stream_response:
+                # feed parsers hold state, so each response needs its own
+                self.root = _parse_streamed(self.lxml_parser.copy(), self.response)
+            else:
+                self.root = lxml.html.fromstring(
+                    self.response.content, parser=self.lxml_parser
+                )
+            if hasattr(self.source, "url"):
+                self.root.make_links_absolute(self.source.url)  # type: ignore
+        else:
+            raise ValueError(f"unknown parser_backend: {self.parser_backend}")
 
 
 class XmlPage(Page):
@@ -349,10 +427,25 @@ class XmlPage(Page):
     `root`
     :   [`lxml.etree.Element`](https://lxml.de/api/lxml.etree._Element-class.html)
     object representing the root XML element on the page.
+
+    `lxml_parser`
+    :   `lxml.etree.XMLParser` used to parse the page, created once per class.
+        Can be replaced on derived class to change parser options, such as
+        `remove_blank_text=True` to drop whitespace-only text, `huge_tree=True`
+        for unusually large documents, or `collect_ids=False` to skip building the
+        `xml:id` table if XPath's `id()` is not used.
     """
 
+    lxml_parser = lxml.etree.XMLParser()
+
     def postprocess_response(self) -> None:
-        self.root = lxml.etree.fromstring(self.response.content)
+        if self.stream_response:
+            # feed parsers hold state, so each response needs its own
+            self.root = _parse_streamed(self.lxml_parser.copy(), self.response)
+        else:
+            self.root = lxml.etree.fromstring(
+                self.response.content, parser=self.lxml_parser
+            )
 
 
 class JsonPage(Page):
@@ -363,9 +456,25 @@ class JsonPage(Page):
 
     `data`
     :   JSON data from response.  (same as `self.response.json()`)
+
+    `use_orjson`
+    :   set to `True` on derived class to decode the response with
+        [orjson](https://github.com/ijl/orjson) if it is installed.
+        orjson only accepts UTF-8, so responses it rejects (e.g. other encodings or
+        `NaN`) fall back to `self.response.json()`.  Note that orjson decodes
+        integers larger than 64 bits as floats, losing precision.
+        (`False` by default)
     """
 
+    use_orjson = False
+
     def postprocess_response(self) -> None:
+        if self.use_orjson and orjson:
+            try:
+                self.data = orjson.loads(self.response.content)
+                return
+            except orjson.JSONDecodeError:
+                pass
         self.data = self.response.json()
 
 
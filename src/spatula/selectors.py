@@ -1,9 +1,25 @@
 import re
+import functools
 from typing import Optional, List, Iterator
-from lxml.etree import _Element  # type: ignore
+import lxml.html  # type: ignore
+from lxml.etree import _Element, XPath as _XPath  # type: ignore
+from lxml.cssselect import CSSSelector  # type: ignore
 from .utils import _display
 
 
+@functools.lru_cache(maxsize=None)
+def _compile_xpath(xpath: str) -> _XPath:
+    return _XPath(xpath)
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_css(css_selector: str, translator: str) -> CSSSelector:
+    return CSSSelector(css_selector, translator=translator)
+
+
+_ALL_LINKS = _compile_xpath("//a")
+
+
 class SelectorError(ValueError):
     """
     Error raised when a selector's constraint (min_items/max_items, etc.) is not met.
@@ -49,23 +65,24 @@ class Selector:
         :param num_items: An exact number of items to match.
         """
         items = list(self.get_items(element))
+        num_found = len(items)
         num_items = self.num_items if num_items is None else num_items
         max_items = self.max_items if max_items is None else max_items
         min_items = self.min_items if min_items is None else min_items
 
-        if num_items is not None and len(items) != num_items:
+        if num_items is not None and num_found != num_items:
             raise SelectorError(
-                f"{self} on {_display(element)} got {len(items)} results, "
+                f"{self} on {_display(element)} got {num_found} results, "
                 f"expected {num_items}"
             )
-        if min_items is not None and len(items) < min_items:
+        if min_items is not None and num_found < min_items:
             raise SelectorError(
-                f"{self} on {_display(element)} got {len(items)} results, "
+                f"{self} on {_display(element)} got {num_found} results, "
                 f"expected at least {min_items}"
             )
-        if max_items is not None and len(items) > max_items:
+        if max_items is not None and num_found > max_items:
             raise SelectorError(
-                f"{self} on {_display(element)} got {len(items)} results, "
+                f"{self} on {_display(element)} got {num_found} results, "
                 f"expected at most {max_items}"
             )
 
@@ -102,9 +119,10 @@ class XPath(Selector):
         """
         super().__init__(min_items=min_items, max_items=max_items, num_items=num_items)
         self.xpath = xpath
+        self._compiled = _compile_xpath(xpath)
 
     def get_items(self, element: _Element) -> Iterator[_Element]:
-        yield from element.xpath(self.xpath)
+        yield from self._compiled(element)
 
     def __str__(self) -> str:  # pragma: no cover
         return f"XPath({self.xpath})"
@@ -132,13 +150,9 @@ class SimilarLink(Selector):
 
     def get_items(self, element: _Element) -> Iterator[_Element]:
         seen = set()
-        for element in element.xpath("//a"):
+        for element in _ALL_LINKS(element):
             href = element.get("href")
-            if (
-                href
-                and href not in seen
-                and self.pattern.match(element.get("href", ""))
-            ):
+            if href and href not in seen and self.pattern.match(href):
                 yield element
                 seen.add(href)
 
@@ -165,9 +179,18 @@ class CSS(Selector):
         """
         super().__init__(min_items=min_items, max_items=max_items, num_items=num_items)
         self.css_selector = css_selector
+        # lxml uses a different translator for HTML & XML elements, compile both
+        self._compiled_html = _compile_css(css_selector, "html")
+        self._compiled_xml = _compile_css(css_selector, "xml")
 
     def get_items(self, element: _Element) -> Iterator[_Element]:
-        yield from element.cssselect(self.css_selector)
+        if isinstance(element, lxml.html.HtmlMixin):
+            yield from self._compiled_html(element)
+        elif isinstance(element, _Element):
+            yield from self._compiled_xml(element)
+        else:
+            # other parsers, such as selectolax, provide their own css method
+            yield from element.css(self.css_selector)
 
     def __str__(self) -> str:  # pragma: no cover
         return f"CSS({self.css_selector})"
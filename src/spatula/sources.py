@@ -40,7 +40,7 @@ class URL(Source):
         self.retries = retries
 
     def get_response(
-        self, scraper: scrapelib.Scraper
+        self, scraper: scrapelib.Scraper, stream: bool = False
     ) -> Optional[requests.models.Response]:
         return scraper.request(
             method=self.method,
@@ -49,6 +49,7 @@ class URL(Source):
             headers=self.headers,
             verify=self.verify,
             timeout=self.timeout,
+            stream=stream,
         )
 
     def __str__(self) -> str:
@@ -64,7 +65,7 @@ class NullSource(Source):
     retries = 0
 
     def get_response(
-        self, scraper: scrapelib.Scraper
+        self, scraper: scrapelib.Scraper, stream: bool = False
     ) -> Optional[requests.models.Response]:
         return None
 
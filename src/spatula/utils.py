@@ -1,5 +1,6 @@
 import pprint
 import typing
+import functools
 import dataclasses
 from lxml.etree import _Element  # type: ignore
 
@@ -13,6 +14,11 @@ except ImportError:  # pragma: no cover
     attr_fields = lambda x: []  # type: ignore # noqa
     attr_asdict = lambda x: {}  # type: ignore # noqa
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
 
 def _display_element(obj: _Element) -> str:
     elem_str = f"<{obj.tag} "
@@ -46,14 +52,24 @@ def _display(obj: typing.Any) -> str:
             return str(obj)
 
 
+@functools.lru_cache(maxsize=None)
+def _get_to_dict(obj_type: type) -> typing.Optional[typing.Callable]:
+    # the kind of data model is determined once per type, not once per object
+    if dataclasses.is_dataclass(obj_type):
+        return dataclasses.asdict
+    elif attr_has(obj_type):
+        return attr_asdict
+    elif _is_pydantic(obj_type):
+        return lambda obj: obj.dict()
+    else:
+        return None
+
+
 def _obj_to_dict(obj: typing.Any) -> typing.Optional[typing.Dict]:
     if obj is None or isinstance(obj, dict):
         return obj
-    elif dataclasses.is_dataclass(obj):
-        return dataclasses.asdict(obj)
-    elif attr_has(obj):
-        return attr_asdict(obj)
-    elif _is_pydantic(obj):
-        return obj.dict()
+    to_dict = _get_to_dict(obj.__class__)
+    if to_dict:
+        return to_dict(obj)
     else:
         raise ValueError(f"invalid type: {obj} ({type(obj)})")
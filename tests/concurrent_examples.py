@@ -0,0 +1,24 @@
+from spatula import HtmlListPage, CSS
+
+
+class HttpListPage(HtmlListPage):
+    selector = CSS("li")
+
+    def process_item(self, item):
+        return {"val": item.text}
+
+
+class FirstHttpListPage(HttpListPage):
+    source = "https://example.com/first"
+
+
+class SecondHttpListPage(HttpListPage):
+    source = "https://example.com/second"
+
+
+class ThirdHttpListPage(HttpListPage):
+    source = "https://example.com/third"
+
+
+class FourthHttpListPage(HttpListPage):
+    source = "https://example.com/fourth"
@@ -1,8 +1,12 @@
 import datetime
 import json
 from pathlib import Path
+import requests
+import scrapelib
 from click.testing import CliRunner
-from spatula.cli import cli
+from requests.adapters import HTTPAdapter
+from spatula.cli import cli, get_page_class, _BatchedEcho, _to_json_line
+from .examples import ExamplePage
 
 
 def test_shell_command():
@@ -14,6 +18,49 @@ def test_shell_command():
     assert "root: " in result.output
 
 
+def test_shell_command_cached_response(monkeypatch):
+    import IPython
+    import requests
+    from scrapelib import Scraper
+
+    def cached_request(self, method, url, **kwargs):
+        # cached responses have their content set directly, without a raw stream
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"<html><body><p>cached</p></body></html>"
+        return response
+
+    monkeypatch.setattr(Scraper, "request", cached_request)
+    monkeypatch.setattr(IPython, "embed", lambda: None)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["shell", "--stream", "https://example.com"])
+    assert result.exit_code == 0
+    assert "root: `lxml HTML element` <html>" in result.output
+
+
+def test_shell_command_fragment(monkeypatch):
+    import IPython
+    import requests
+    from scrapelib import Scraper
+
+    def fragment_request(self, method, url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"<div><p>a</p></div>"
+        return response
+
+    monkeypatch.setattr(Scraper, "request", fragment_request)
+    monkeypatch.setattr(IPython, "embed", lambda: None)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["shell", "https://example.com"])
+    assert result.exit_code == 0
+    assert "root: `lxml HTML element` <div>" in result.output
+    # streaming builds a full document around the fragment
+    result = runner.invoke(cli, ["shell", "--stream", "https://example.com"])
+    assert result.exit_code == 0
+    assert "root: `lxml HTML element` <html>" in result.output
+
+
 def test_scrape_command_basic():
     runner = CliRunner()
 
@@ -30,6 +77,24 @@ def test_scrape_command_basic():
         assert f"success: wrote 5 objects to _scrapes/{today}/002" in result.output
 
 
+def test_scrape_command_skips_existing_dirs():
+    runner = CliRunner()
+
+    today = datetime.date.today().strftime("%Y-%m-%d")
+
+    with runner.isolated_filesystem():
+        Path(f"_scrapes/{today}/007").mkdir(parents=True)
+        result = runner.invoke(cli, ["scrape", "tests.examples.ExampleListPage"])
+        assert result.exit_code == 0
+        assert f"success: wrote 5 objects to _scrapes/{today}/008" in result.output
+
+        # unexpected names fall back to probing from 001
+        Path(f"_scrapes/{today}/other").mkdir()
+        result = runner.invoke(cli, ["scrape", "tests.examples.ExampleListPage"])
+        assert result.exit_code == 0
+        assert f"success: wrote 5 objects to _scrapes/{today}/001" in result.output
+
+
 def test_scrape_command_module():
     runner = CliRunner()
 
@@ -42,6 +107,100 @@ def test_scrape_command_module():
         assert f"success: wrote 10 objects to _scrapes/{today}/001" in result.output
 
 
+def test_scrape_command_concurrency():
+    runner = CliRunner()
+
+    today = datetime.date.today().strftime("%Y-%m-%d")
+
+    with runner.isolated_filesystem():
+        result = runner.invoke(cli, ["scrape", "tests.examples", "--concurrency", "2"])
+        assert result.exit_code == 0
+        assert f"success: wrote 10 objects to _scrapes/{today}/001" in result.output
+        assert len(list(Path(f"_scrapes/{today}/001").glob("*.json"))) == 10
+
+
+def test_scrape_command_jsonl_format():
+    runner = CliRunner()
+
+    with runner.isolated_filesystem():
+        result = runner.invoke(
+            cli,
+            [
+                "scrape",
+                "tests.examples",
+                "-o",
+                "mydir",
+                "--format",
+                "jsonl",
+                "--concurrency",
+                "2",
+            ],
+        )
+        assert result.exit_code == 0
+        assert "success: wrote 10 objects to mydir" in result.output
+        assert [p.name for p in Path("mydir").iterdir()] == ["items.jsonl"]
+        with open("mydir/items.jsonl") as f:
+            lines = [json.loads(line) for line in f]
+        assert len(lines) == 10
+        assert {"val": "1"} in lines
+
+
+def _fake_send(self, request, **kwargs):
+    response = requests.Response()
+    response.status_code = 200
+    response.url = request.url
+    response._content = b"<ul><li>one</li><li>two</li></ul>"
+    return response
+
+
+def test_scrape_command_concurrency_fastmode(monkeypatch):
+    monkeypatch.setattr(HTTPAdapter, "send", _fake_send)
+    runner = CliRunner()
+
+    with runner.isolated_filesystem():
+        # each worker needs its own scraper, as the sqlite cache is per-thread
+        for _ in range(2):
+            result = runner.invoke(
+                cli,
+                [
+                    "scrape",
+                    "tests.concurrent_examples",
+                    "-o",
+                    "mydir",
+                    "--rmdir",
+                    "--fastmode",
+                    "--concurrency",
+                    "2",
+                ],
+            )
+            assert result.exit_code == 0, result.output
+            assert "success: wrote 8 objects to mydir" in result.output
+
+
+def test_scrape_command_concurrency_throttled(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(HTTPAdapter, "send", _fake_send)
+    monkeypatch.setattr(scrapelib.time, "sleep", sleeps.append)
+    runner = CliRunner()
+
+    with runner.isolated_filesystem():
+        result = runner.invoke(
+            cli,
+            ["scrape", "tests.concurrent_examples", "--concurrency", "2"],
+        )
+        assert result.exit_code == 0, result.output
+        # 4 initial pages across 2 workers: each worker's scraper is reused, so
+        # every request after a worker's first one is throttled
+        assert len(sleeps) >= 2
+
+
+def test_to_json_line():
+    # integers beyond 64 bits and non-ascii text are handled like json.dump
+    data = {"id": 2**70, "name": "Zoë"}
+    assert _to_json_line(data) == (json.dumps(data) + "\n").encode()
+    assert json.loads(_to_json_line(data)) == data
+
+
 def test_scrape_command_output_dir_flag():
     runner = CliRunner()
 
@@ -222,3 +381,47 @@ def test_test_command_input_with_example():
     )
     assert result.exit_code == 0
     assert "{'name': 'Tony', 'number': 65}" in result.output
+
+
+def test_dns_cache(monkeypatch):
+    from spatula import cli as cli_mod
+
+    calls = []
+
+    def fake_getaddrinfo(*args):
+        calls.append(args)
+        return [("result", args)]
+
+    monkeypatch.setattr(cli_mod, "_getaddrinfo", fake_getaddrinfo)
+    monkeypatch.setattr(cli_mod, "_dns_cache", {})
+
+    first = cli_mod._cached_getaddrinfo("example.com", 443)
+    assert cli_mod._cached_getaddrinfo("example.com", 443) == first
+    assert len(calls) == 1
+
+    # different port is a different lookup
+    cli_mod._cached_getaddrinfo("example.com", 80)
+    assert len(calls) == 2
+
+    # expired entries are looked up again
+    monkeypatch.setattr(cli_mod.config, "DNS_CACHE_TTL", -1)
+    cli_mod._dns_cache.clear()
+    cli_mod._cached_getaddrinfo("example.com", 443)
+    cli_mod._cached_getaddrinfo("example.com", 443)
+    assert len(calls) == 4
+
+
+def test_get_page_class():
+    assert get_page_class("tests.examples.ExamplePage") is ExamplePage
+    get_page_class("tests.examples.ExamplePage")
+    assert get_page_class.cache_info().hits >= 1
+
+
+def test_batched_echo(capsys):
+    with _BatchedEcho(batch_size=2) as out:
+        out.echo("one")
+        assert capsys.readouterr().out == ""
+        out.echo("two")
+        assert capsys.readouterr().out == "one\ntwo\n"
+        out.echo("three")
+    assert capsys.readouterr().out == "three\n"
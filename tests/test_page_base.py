@@ -155,6 +155,77 @@ def test_fetch_data_postprocess():
     assert p._postprocessed
 
 
+def test_fetch_data_stream_response():
+    class StreamScraper(DummyScraper):
+        def request(self, url, **kwargs):
+            self.stream = kwargs["stream"]
+            return super().request(url, **kwargs)
+
+    class StreamPage(Page):
+        stream_response = True
+
+    scraper = StreamScraper()
+    StreamPage(source=SOURCE)._fetch_data(scraper)
+    assert scraper.stream is True
+    DummyPage(source=SOURCE)._fetch_data(scraper)
+    assert scraper.stream is False
+
+
+class ClosableResponse:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ClosableSource:
+    def __init__(self, retries=2):
+        self.retries = retries
+        self.responses = []
+
+    def get_response(self, scraper, stream=False):
+        self.responses.append(ClosableResponse())
+        return self.responses[-1]
+
+
+def test_fetch_data_stream_response_closed_on_reject():
+    class RejectPage(Page):
+        stream_response = True
+
+        def accept_response(self, response):
+            return False
+
+    config.RETRY_WAIT_SECONDS = 0.1
+    source = ClosableSource()
+    with pytest.raises(RejectedResponse):
+        RejectPage(source=source)._fetch_data(DummyScraper())
+    assert len(source.responses) == 3
+    assert all(r.closed for r in source.responses)
+
+
+def test_fetch_data_stream_response_closed_on_error():
+    class ClosableError(Error):
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    class ErrorSource:
+        retries = None
+
+        def get_response(self, scraper, stream=False):
+            raise HTTPError(response)
+
+    class StreamErrorPage(Page):
+        stream_response = True
+
+    response = ClosableError()
+    # the default process_error_response re-raises the error
+    with pytest.raises(HTTPError):
+        StreamErrorPage(source=ErrorSource())._fetch_data(DummyScraper())
+    assert response.closed
+
+
 def test_default_processing():
     p = DummyPage()
     with pytest.raises(ArithmeticError):
@@ -1,4 +1,9 @@
+import io
 import json
+import math
+import pytest
+import requests
+import lxml.etree
 from dataclasses import dataclass
 from spatula import (
     HtmlPage,
@@ -9,6 +14,7 @@ from spatula import (
     XmlListPage,
     JsonListPage,
     XPath,
+    CSS,
     URL,
 )
 
@@ -37,6 +43,86 @@ def test_html_page():
     assert link.get("href") == "https://example.com/test"
 
 
+def test_html_page_selectolax():
+    pytest.importorskip("selectolax")
+
+    class SelectolaxPage(HtmlPage):
+        parser_backend = "selectolax"
+
+    p = SelectolaxPage(source=URL(SOURCE))
+    p.response = Response(b"<html><a class='x' href='/test'>link</a></html>")
+    p.postprocess_response()
+    assert CSS("a.x").match_one(p.root).text() == "link"
+    with pytest.raises(TypeError):
+        XPath("//a").match(p.root)
+
+
+def test_html_list_page_selectolax_requires_css():
+    pytest.importorskip("selectolax")
+
+    class SelectolaxListPage(HtmlListPage):
+        parser_backend = "selectolax"
+        selector = XPath("//li")
+
+    p = SelectolaxListPage(source=URL(SOURCE))
+    p.response = Response(b"<ul><li>one</li></ul>")
+    with pytest.raises(TypeError):
+        p.postprocess_response()
+
+
+def _streamed_response(content):
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(content)
+    return response
+
+
+def test_html_page_streamed():
+    class StreamedPage(HtmlPage):
+        stream_response = True
+
+    content = b"<html><a href='/test'>link</a></html>"
+    p = StreamedPage(source=URL(SOURCE))
+    p.response = _streamed_response(content)
+    p.postprocess_response()
+    assert p.root.xpath("//a")[0].get("href") == "https://example.com/test"
+    # content is still available after being streamed to the parser
+    assert p.response.content == content
+
+
+def test_html_page_streamed_from_cache():
+    class StreamedPage(HtmlPage):
+        stream_response = True
+
+    # cached responses have their content set directly, without a raw stream
+    response = requests.Response()
+    response._content = b"<html><a href='/test'>link</a></html>"
+    p = StreamedPage(source=URL(SOURCE))
+    p.response = response
+    p.postprocess_response()
+    assert p.root.xpath("//a")[0].get("href") == "https://example.com/test"
+
+
+def test_html_page_streamed_empty():
+    class StreamedPage(HtmlPage):
+        stream_response = True
+
+    p = StreamedPage(source=URL(SOURCE))
+    p.response = _streamed_response(b"   ")
+    with pytest.raises(lxml.etree.ParserError):
+        p.postprocess_response()
+
+
+def test_xml_page_streamed():
+    class StreamedPage(XmlPage):
+        stream_response = True
+
+    p = StreamedPage(source=SOURCE)
+    p.response = _streamed_response(b"<data><is><nested /></is></data>")
+    p.postprocess_response()
+    assert p.root.tag == "data"
+
+
 def test_xml_page():
     p = XmlPage(source=SOURCE)
     p.response = Response(b"<data><is><nested /></is></data>")
@@ -44,6 +130,30 @@ def test_xml_page():
     assert p.root.tag == "data"
 
 
+def test_xml_page_id_lookup():
+    p = XmlPage(source=SOURCE)
+    p.response = Response(b"<data><item xml:id='x'/></data>")
+    p.postprocess_response()
+    assert len(p.root.xpath("id('x')")) == 1
+
+
+def test_html_page_id_lookup():
+    p = HtmlPage(source=URL(SOURCE))
+    p.response = Response(b"<html><body><p id='x'>one</p></body></html>")
+    p.postprocess_response()
+    assert len(p.root.xpath("id('x')")) == 1
+
+
+def test_xml_page_custom_parser():
+    class BlanklessPage(XmlPage):
+        lxml_parser = lxml.etree.XMLParser(remove_blank_text=True)
+
+    p = BlanklessPage(source=SOURCE)
+    p.response = Response(b"<data>\n  <is>\n    <nested />\n  </is>\n</data>")
+    p.postprocess_response()
+    assert p.root[0].tail is None
+
+
 def test_json_page():
     nested = {"data": {"is": "nested"}}
     p = JsonPage(source=SOURCE)
@@ -52,6 +162,42 @@ def test_json_page():
     assert p.data == nested
 
 
+def test_json_page_big_int():
+    p = JsonPage(source=SOURCE)
+    p.response = Response(json.dumps({"id": 2**70}))
+    p.postprocess_response()
+    assert p.data == {"id": 2**70}
+
+
+class OrjsonPage(JsonPage):
+    use_orjson = True
+
+
+def test_json_page_orjson():
+    nested = {"data": {"is": "nested"}}
+    p = OrjsonPage(source=SOURCE)
+    p.response = Response(json.dumps(nested).encode())
+    p.postprocess_response()
+    assert p.data == nested
+
+
+def test_json_page_orjson_fallback():
+    # orjson rejects NaN, response.json() accepts it
+    p = OrjsonPage(source=SOURCE)
+    p.response = Response(b'{"val": NaN}')
+    p.postprocess_response()
+    assert math.isnan(p.data["val"])
+
+
+def test_json_page_orjson_not_installed(monkeypatch):
+    monkeypatch.setattr("spatula.pages.orjson", None)
+    nested = {"data": {"is": "nested"}}
+    p = OrjsonPage(source=SOURCE)
+    p.response = Response(json.dumps(nested))
+    p.postprocess_response()
+    assert p.data == nested
+
+
 def test_csv_list_page():
     p = CsvListPage(source=SOURCE)
     p.response = Response("a,b,c\n1,2,3\n4,5,6")
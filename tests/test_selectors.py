@@ -1,5 +1,6 @@
 import pytest
 import lxml.etree
+import lxml.html
 from spatula import CSS, XPath, SimilarLink, SelectorError, Selector
 
 dummy_html = """<html>
@@ -99,3 +100,13 @@ def test_xpath_selector():
 def test_similar_link_selector():
     root = lxml.etree.fromstring(dummy_html)
     assert len(SimilarLink("https").match(root)) == 2
+
+
+def test_css_selector_html():
+    root = lxml.html.fromstring(dummy_html)
+    assert CSS(".first b").match_one(root).text == "one"
+
+
+def test_selectors_compiled_once():
+    assert XPath("//b")._compiled is XPath("//b")._compiled
+    assert CSS("li b")._compiled_html is CSS("li b")._compiled_html